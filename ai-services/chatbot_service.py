@@ -1,24 +1,151 @@
 import openai
 import json
 import logging
+import re
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+from contextlib import asynccontextmanager
+from functools import lru_cache
 import asyncio
-from sentence_transformers import SentenceTransformer
+from embedding_model import load_embedding_model
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import faiss
 import sqlite3
+import aiosqlite
 import os
 
 logger = logging.getLogger(__name__)
 
+# Embeddings are stored int8-quantized; vectors are normalized before
+# quantization so a single global scale of 1/127 reconstructs them
+INT8_EMBEDDING_SCALE = 1.0 / 127.0
+EMBEDDING_DIM = 384
+
+
+def quantize_embedding(embedding: np.ndarray) -> bytes:
+    """Quantize a normalized float32 embedding to int8 bytes for storage"""
+    return np.clip(np.round(embedding * 127), -127, 127).astype(np.int8).tobytes()
+
+
+# Simple fact extraction patterns, compiled into one alternation so a
+# message is scanned in a single pass instead of once per pattern
+FACT_PATTERNS = {
+    'preference': ['i like', 'i love', 'i prefer', 'i enjoy', 'favorite'],
+    'dislike': ['i hate', 'i dislike', 'not a fan', 'avoid'],
+    'experience': ['i went to', 'i visited', 'i tried', 'last time'],
+    'plan': ['planning to', 'want to visit', 'thinking about', 'hoping to']
+}
+FACT_PATTERN_TYPES = {
+    pattern: fact_type
+    for fact_type, patterns in FACT_PATTERNS.items()
+    for pattern in patterns
+}
+FACT_PATTERN_RE = re.compile(
+    '|'.join(re.escape(pattern) for pattern in sorted(FACT_PATTERN_TYPES, key=len, reverse=True))
+)
+
+# Persona dicts rarely change per user, so memoize the formatting on a
+# frozenset of their items
+@lru_cache(maxsize=256)
+def _primary_persona_cached(persona_items: frozenset) -> str:
+    if not persona_items:
+        return "balanced traveler"
+
+    primary = max(persona_items, key=lambda x: x[1])
+    return f"{primary[0]} (score: {primary[1]:.2f})"
+
+
+@lru_cache(maxsize=256)
+def _category_preferences_cached(category_items: frozenset) -> str:
+    if not category_items:
+        return "no specific preferences"
+
+    top_categories = sorted(category_items, key=lambda x: x[1], reverse=True)[:3]
+    return ", ".join([f"{cat} ({score:.2f})" for cat, score in top_categories])
+
+
+# Cached so SQLite can reuse the prepared statement across chat turns
+INSERT_CONVERSATION_SQL = '''
+    INSERT INTO conversation_memory
+    (user_id, session_id, message_type, content, emb_offset, importance_score)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
 class AITwinChatbot:
+    POOL_SIZE = 8
+
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.openai_client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.embedding_model = load_embedding_model()
         self.memory_db_path = 'data/chatbot_memory.db'
+        self.connection_pool = asyncio.Queue()
+        # Cap concurrent outbound LLM calls so a burst of users can't
+        # exhaust the API rate limit all at once
+        self.openai_semaphore = asyncio.Semaphore(8)
+        # Post-response writes run in the background; bounded so they
+        # can't pile up under load
+        self.background_semaphore = asyncio.Semaphore(32)
+        self._background_tasks = set()
+        # Memoize repeated work: common queries ("hello", "paris") skip the
+        # SBERT forward pass, and unchanged persona/context skip rebuilding
+        # the multi-hundred-token system prompt
+        self._encode_query_cached = lru_cache(maxsize=4096)(self._encode_query_bytes)
+        self._persona_prompt_cached = lru_cache(maxsize=1024)(self._render_persona_prompt)
         self.init_memory_db()
-        
+        self.poi_index = self.load_poi_index()
+
+    def schedule_background(self, coro):
+        """Run a coroutine off the critical path, keeping a reference alive"""
+        async def _bounded():
+            async with self.background_semaphore:
+                await coro
+
+        task = asyncio.create_task(_bounded())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    def _encode_query_bytes(self, text: str) -> bytes:
+        """Encode and normalize text, returned as bytes so results are cacheable"""
+        return self.embedding_model.encode(text, normalize_embeddings=True).astype(np.float32).tobytes()
+
+    def encode_query(self, text: str) -> np.ndarray:
+        """Encode a query with an LRU cache over the raw text"""
+        return np.frombuffer(self._encode_query_cached(text), dtype=np.float32)
+
+    def embedding_file(self, user_id: int) -> str:
+        """Path of the per-user append-only int8 embedding slab"""
+        return os.path.join('data', f'emb_{user_id}.i8')
+
+    def append_user_embeddings(self, user_id: int, blobs: List[bytes]) -> List[int]:
+        """Append quantized vectors to the user's slab, returning row offsets"""
+        with open(self.embedding_file(user_id), 'ab') as f:
+            start = f.tell() // EMBEDDING_DIM
+            for blob in blobs:
+                f.write(blob)
+        return list(range(start, start + len(blobs)))
+
+    @asynccontextmanager
+    async def get_db_connection(self):
+        """Borrow a pooled aiosqlite connection, creating one if the pool is empty"""
+        try:
+            conn = self.connection_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            conn = await aiosqlite.connect(self.memory_db_path)
+            # One-time per-connection setup: WAL avoids writer starvation
+            # across concurrent chat sessions
+            await conn.execute('PRAGMA journal_mode=WAL')
+            await conn.execute('PRAGMA synchronous=NORMAL')
+            await conn.execute('PRAGMA temp_store=MEMORY')
+            await conn.execute('PRAGMA mmap_size=268435456')
+        try:
+            yield conn
+        finally:
+            if self.connection_pool.qsize() < self.POOL_SIZE:
+                self.connection_pool.put_nowait(conn)
+            else:
+                await conn.close()
+
     def init_memory_db(self):
         """Initialize SQLite database for conversation memory"""
         os.makedirs('data', exist_ok=True)
@@ -33,7 +160,7 @@ class AITwinChatbot:
                 session_id TEXT NOT NULL,
                 message_type TEXT NOT NULL,
                 content TEXT NOT NULL,
-                embedding BLOB,
+                emb_offset INTEGER,
                 importance_score REAL DEFAULT 0.5,
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                 ttl_hours INTEGER DEFAULT 168
@@ -48,7 +175,8 @@ class AITwinChatbot:
                 fact_content TEXT NOT NULL,
                 confidence REAL DEFAULT 0.8,
                 last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
-                source TEXT DEFAULT 'conversation'
+                source TEXT DEFAULT 'conversation',
+                UNIQUE(user_id, fact_type, fact_content)
             )
         ''')
         
@@ -64,16 +192,140 @@ class AITwinChatbot:
             )
         ''')
         
+        # Upgrade databases created before the slab/upsert layout in place:
+        # CREATE TABLE IF NOT EXISTS leaves old tables untouched, so the
+        # emb_offset column and the user_facts uniqueness may be missing
+        columns = {row[1] for row in cursor.execute(
+            'PRAGMA table_info(conversation_memory)')}
+        if 'emb_offset' not in columns:
+            cursor.execute(
+                'ALTER TABLE conversation_memory ADD COLUMN emb_offset INTEGER'
+            )
+        # The fact upsert needs a unique index over its conflict target;
+        # tables from before the inline UNIQUE constraint lack it. Dedupe
+        # rows written in that window, then enforce uniqueness going forward
+        # (redundant but harmless on fresh tables)
+        cursor.execute('''
+            DELETE FROM user_facts WHERE id NOT IN (
+                SELECT MIN(id) FROM user_facts
+                GROUP BY user_id, fact_type, fact_content
+            )
+        ''')
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_user_facts_unique
+            ON user_facts(user_id, fact_type, fact_content)
+        ''')
+
+        # Indexes for the per-user read paths: history and retrieval filter on
+        # user_id and order by timestamp DESC, so these keep both queries on
+        # an index range scan as the memory table grows
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_conv_user_ts
+            ON conversation_memory(user_id, timestamp DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_conv_user_emb
+            ON conversation_memory(user_id) WHERE emb_offset IS NOT NULL
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_user_facts_user
+            ON user_facts(user_id)
+        ''')
+        cursor.execute('ANALYZE')
+
         conn.commit()
         conn.close()
 
+    def load_poi_index(self) -> faiss.Index:
+        """Build the in-memory POI vector index from SQLite at startup
+
+        SQLite stays the source of truth; the HNSW index makes nearest-POI
+        lookups sub-linear instead of a full-table scan.
+        """
+        index = faiss.IndexIDMap(faiss.IndexHNSWFlat(384, 32))
+        conn = sqlite3.connect(self.memory_db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT poi_id, embedding FROM poi_knowledge
+            WHERE embedding IS NOT NULL AND poi_id IS NOT NULL
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+
+        # Blobs carry no format marker, so the byte length tells the
+        # generations apart: int8 rows are one byte per dimension, rows
+        # written before quantization are float32 (4 bytes per dimension).
+        # Anything else is corrupt and skipped rather than decoded as noise.
+        poi_ids = []
+        vectors = []
+        for poi_id, blob in rows:
+            if len(blob) == EMBEDDING_DIM:
+                vectors.append(
+                    np.frombuffer(blob, dtype=np.int8).astype(np.float32)
+                    * INT8_EMBEDDING_SCALE
+                )
+            elif len(blob) == EMBEDDING_DIM * 4:
+                vectors.append(np.frombuffer(blob, dtype=np.float32))
+            else:
+                logger.warning(
+                    "Skipping POI %s: unexpected embedding blob of %d bytes",
+                    poi_id, len(blob)
+                )
+                continue
+            poi_ids.append(poi_id)
+
+        if vectors:
+            index.add_with_ids(
+                np.vstack(vectors), np.asarray(poi_ids, dtype=np.int64)
+            )
+
+        return index
+
+    async def search_poi_knowledge(self, query: str, limit: int = 5) -> List[Dict]:
+        """Find the POIs closest to a query via the vector index"""
+        try:
+            if self.poi_index.ntotal == 0:
+                return []
+
+            query_embedding = await asyncio.to_thread(self.encode_query, query)
+            _, poi_ids = self.poi_index.search(query_embedding.reshape(1, -1), limit)
+            poi_ids = [int(poi_id) for poi_id in poi_ids[0] if poi_id != -1]
+            if not poi_ids:
+                return []
+
+            placeholders = ','.join('?' * len(poi_ids))
+            async with self.get_db_connection() as conn:
+                cursor = await conn.execute(f'''
+                    SELECT poi_id, poi_name, description, tips
+                    FROM poi_knowledge WHERE poi_id IN ({placeholders})
+                ''', poi_ids)
+                rows = await cursor.fetchall()
+
+            pois_by_id = {row[0]: row for row in rows}
+            return [
+                {
+                    'poi_id': poi_id,
+                    'poi_name': pois_by_id[poi_id][1],
+                    'description': pois_by_id[poi_id][2],
+                    'tips': pois_by_id[poi_id][3]
+                }
+                for poi_id in poi_ids if poi_id in pois_by_id
+            ]
+
+        except Exception as e:
+            logger.error(f"Error searching POI knowledge: {e}")
+            return []
+
     async def chat(self, user_id: int, message: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Main chat interface with persona conditioning"""
         try:
-            # Get user's Travel DNA and conversation history
-            travel_dna = await self.get_user_travel_dna(user_id)
-            conversation_history = await self.get_conversation_history(user_id, limit=10)
-            relevant_memories = await self.retrieve_relevant_memories(user_id, message)
+            # Get user's Travel DNA, conversation history and relevant
+            # memories concurrently — the three calls are independent
+            travel_dna, conversation_history, relevant_memories = await asyncio.gather(
+                self.get_user_travel_dna(user_id),
+                self.get_conversation_history(user_id, limit=10),
+                self.retrieve_relevant_memories(user_id, message)
+            )
             
             # Build system prompt with persona conditioning
             system_prompt = self.build_persona_prompt(travel_dna, relevant_memories, context)
@@ -94,12 +346,11 @@ class AITwinChatbot:
             # Get AI response
             response = await self.get_openai_response(messages)
             
-            # Store conversation in memory
+            # Persist the turn and extracted facts in the background — the
+            # user shouldn't wait on the embed + DB writes
             session_id = context.get('session_id', f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-            await self.store_conversation(user_id, session_id, message, response, context)
-            
-            # Extract and store user facts
-            await self.extract_user_facts(user_id, message, response)
+            self.schedule_background(self.store_conversation(user_id, session_id, message, response, context))
+            self.schedule_background(self.extract_user_facts(user_id, message, response))
             
             return {
                 "response": response,
@@ -118,8 +369,25 @@ class AITwinChatbot:
             }
 
     def build_persona_prompt(self, travel_dna: Dict, memories: List[Dict], context: Dict = None) -> str:
-        """Build system prompt with Travel DNA conditioning"""
-        base_prompt = """You are an AI travel companion that adapts to the user's personality and preferences. 
+        """Build system prompt with Travel DNA conditioning (LRU-cached on inputs)"""
+        travel_dna_key = json.dumps(travel_dna, sort_keys=True, default=str) if travel_dna else None
+        memories_key = tuple(memory['content'] for memory in memories[:3]) if memories else ()
+        context_key = json.dumps(context, sort_keys=True, default=str) if context else None
+        return self._persona_prompt_cached(travel_dna_key, memories_key, context_key)
+
+    def _render_persona_prompt(self, travel_dna_json: Optional[str], memory_contents: tuple,
+                               context_json: Optional[str]) -> str:
+        """Render the persona prompt from hashable cache keys
+
+        Sections are ordered most-stable-first (static guidelines, then
+        per-user persona, then context, then memories) so the system message
+        keeps a byte-identical prefix across turns and the provider's
+        automatic prompt caching can reuse it.
+        """
+        travel_dna = json.loads(travel_dna_json) if travel_dna_json else None
+        context = json.loads(context_json) if context_json else None
+
+        base_prompt = """You are an AI travel companion that adapts to the user's personality and preferences.
 You provide personalized travel recommendations, answer questions, and help plan activities.
 
 Key traits:
@@ -127,7 +395,15 @@ Key traits:
 - Knowledgeable about travel and local experiences
 - Adaptive to user's communication style
 - Proactive in suggesting relevant activities
-- Safety-conscious and practical"""
+- Safety-conscious and practical
+
+RESPONSE GUIDELINES:
+- Keep responses conversational and helpful
+- Suggest specific places when relevant
+- Ask follow-up questions to better understand needs
+- Provide practical details (distance, time, cost when known)
+- Be encouraging and enthusiastic about travel experiences
+- If you don't know something specific, say so and suggest alternatives"""
 
         if travel_dna:
             persona_section = f"""
@@ -144,13 +420,6 @@ Adapt your responses to match this persona. Be more adventurous for adventurers,
 
             base_prompt += persona_section
 
-        if memories:
-            memory_section = "\n\nRELEVANT MEMORIES:\n"
-            for memory in memories[:3]:  # Top 3 most relevant
-                memory_section += f"- {memory['content']}\n"
-            memory_section += "\nUse these memories to provide personalized responses."
-            base_prompt += memory_section
-
         if context:
             context_section = f"""
 
@@ -163,29 +432,29 @@ CURRENT CONTEXT:
 Consider this context when making recommendations."""
             base_prompt += context_section
 
-        base_prompt += """
-
-RESPONSE GUIDELINES:
-- Keep responses conversational and helpful
-- Suggest specific places when relevant
-- Ask follow-up questions to better understand needs
-- Provide practical details (distance, time, cost when known)
-- Be encouraging and enthusiastic about travel experiences
-- If you don't know something specific, say so and suggest alternatives"""
+        # Memories are the most volatile section, so they go last to avoid
+        # invalidating the cached prefix for everything above
+        if memory_contents:
+            memory_section = "\n\nRELEVANT MEMORIES:\n"
+            for content in memory_contents:  # Top 3 most relevant
+                memory_section += f"- {content}\n"
+            memory_section += "\nUse these memories to provide personalized responses."
+            base_prompt += memory_section
 
         return base_prompt
 
     async def get_openai_response(self, messages: List[Dict]) -> str:
         """Get response from OpenAI with error handling"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7,
-                presence_penalty=0.1,
-                frequency_penalty=0.1
-            )
+            async with self.openai_semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.7,
+                    presence_penalty=0.1,
+                    frequency_penalty=0.1
+                )
             return response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
@@ -195,27 +464,30 @@ RESPONSE GUIDELINES:
                                 ai_response: str, context: Dict = None):
         """Store conversation in memory database"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
-            
-            # Store user message
-            user_embedding = self.embedding_model.encode(user_message).tobytes()
-            cursor.execute('''
-                INSERT INTO conversation_memory 
-                (user_id, session_id, message_type, content, embedding, importance_score)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (user_id, session_id, 'user', user_message, user_embedding, 0.6))
-            
-            # Store AI response
-            ai_embedding = self.embedding_model.encode(ai_response).tobytes()
-            cursor.execute('''
-                INSERT INTO conversation_memory 
-                (user_id, session_id, message_type, content, embedding, importance_score)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (user_id, session_id, 'assistant', ai_response, ai_embedding, 0.5))
-            
-            conn.commit()
-            conn.close()
+            # Only the user turn is embedded — users query in their own
+            # words, so the assistant text is never a retrieval anchor —
+            # and trivially short messages ("hi") aren't worth a forward pass
+            user_offset = None
+            if len(user_message.split()) >= 3:
+                embedding = await asyncio.to_thread(
+                    self.embedding_model.encode,
+                    user_message,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+                # Vectors live in the per-user slab; SQLite only keeps offsets
+                user_offset, = self.append_user_embeddings(user_id, [quantize_embedding(embedding)])
+
+            # Store both rows in one prepared statement and one transaction,
+            # so WAL flushes the journal once per turn instead of per insert
+            rows = [
+                (user_id, session_id, 'user', user_message, user_offset, 0.6),
+                (user_id, session_id, 'assistant', ai_response, None, 0.5)
+            ]
+            async with self.get_db_connection() as conn:
+                await conn.execute('BEGIN')
+                await conn.executemany(INSERT_CONVERSATION_SQL, rows)
+                await conn.commit()
             
         except Exception as e:
             logger.error(f"Error storing conversation: {e}")
@@ -223,49 +495,53 @@ RESPONSE GUIDELINES:
     async def retrieve_relevant_memories(self, user_id: int, query: str, limit: int = 5) -> List[Dict]:
         """Retrieve relevant memories using semantic search"""
         try:
-            query_embedding = self.embedding_model.encode(query)
-            
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
+            query_embedding = await asyncio.to_thread(self.encode_query, query)
             
             # Get recent memories with embeddings
-            cursor.execute('''
-                SELECT content, embedding, importance_score, timestamp
-                FROM conversation_memory
-                WHERE user_id = ? AND embedding IS NOT NULL
-                ORDER BY timestamp DESC
-                LIMIT 50
-            ''', (user_id,))
-            
-            memories = cursor.fetchall()
-            conn.close()
-            
-            if not memories:
+            async with self.get_db_connection() as conn:
+                cursor = await conn.execute('''
+                    SELECT content, emb_offset, importance_score, timestamp
+                    FROM conversation_memory
+                    WHERE user_id = ? AND emb_offset IS NOT NULL
+                    ORDER BY timestamp DESC
+                    LIMIT 50
+                ''', (user_id,))
+                memories = await cursor.fetchall()
+            
+            if not memories or not os.path.exists(self.embedding_file(user_id)):
                 return []
-            
-            # Calculate similarity scores
-            relevant_memories = []
-            for content, embedding_bytes, importance, timestamp in memories:
-                try:
-                    memory_embedding = np.frombuffer(embedding_bytes, dtype=np.float32)
-                    similarity = cosine_similarity([query_embedding], [memory_embedding])[0][0]
-                    
-                    # Combine similarity with importance score
-                    relevance_score = similarity * 0.7 + importance * 0.3
-                    
-                    if relevance_score > 0.3:  # Threshold for relevance
-                        relevant_memories.append({
-                            'content': content,
-                            'relevance_score': relevance_score,
-                            'timestamp': timestamp
-                        })
-                except Exception as e:
-                    logger.warning(f"Error processing memory embedding: {e}")
-                    continue
-            
-            # Sort by relevance and return top results
-            relevant_memories.sort(key=lambda x: x['relevance_score'], reverse=True)
-            return relevant_memories[:limit]
+
+            # Slice the memmapped slab into one (N, 384) matrix and compute
+            # every similarity with a single BLAS matrix-vector product;
+            # embeddings are stored normalized, so the raw dot product is
+            # the cosine
+            slab = np.memmap(self.embedding_file(user_id), dtype=np.int8, mode='r')
+            slab = slab.reshape(-1, EMBEDDING_DIM)
+            offsets = np.fromiter((row[1] for row in memories), dtype=np.int64)
+            memory_matrix = slab[offsets].astype(np.float32)
+
+            # Fold the dequantization scale and the 0.7 similarity weight
+            # into the query vector, so the whole score reduce is one fused
+            # matvec plus one weighted add over N elements
+            scaled_query = query_embedding * (0.7 * INT8_EMBEDDING_SCALE)
+            importances = np.fromiter((row[2] for row in memories), dtype=np.float32)
+            relevance_scores = memory_matrix @ scaled_query
+            relevance_scores += importances * 0.3
+
+            # Partial top-k selection instead of a full Python sort
+            top_k = min(limit, len(memories))
+            top_indices = np.argpartition(-relevance_scores, top_k - 1)[:top_k]
+            top_indices = top_indices[np.argsort(-relevance_scores[top_indices])]
+
+            return [
+                {
+                    'content': memories[idx][0],
+                    'relevance_score': float(relevance_scores[idx]),
+                    'timestamp': memories[idx][3]
+                }
+                for idx in top_indices
+                if relevance_scores[idx] > 0.3  # Threshold for relevance
+            ]
             
         except Exception as e:
             logger.error(f"Error retrieving memories: {e}")
@@ -274,44 +550,40 @@ RESPONSE GUIDELINES:
     async def extract_user_facts(self, user_id: int, user_message: str, ai_response: str):
         """Extract and store user facts from conversation"""
         try:
-            # Simple fact extraction patterns
-            fact_patterns = {
-                'preference': ['i like', 'i love', 'i prefer', 'i enjoy', 'favorite'],
-                'dislike': ['i hate', 'i dislike', 'not a fan', 'avoid'],
-                'experience': ['i went to', 'i visited', 'i tried', 'last time'],
-                'plan': ['planning to', 'want to visit', 'thinking about', 'hoping to']
-            }
-            
             message_lower = user_message.lower()
             facts_found = []
+            seen_types = set()
+
+            # One scan over the message; keep the first hit per fact type
+            for match in FACT_PATTERN_RE.finditer(message_lower):
+                fact_type = FACT_PATTERN_TYPES[match.group(0)]
+                if fact_type in seen_types:
+                    continue
+                seen_types.add(fact_type)
+                fact_content = user_message[match.start():match.start() + 100]  # Get context
+                facts_found.append({
+                    'type': fact_type,
+                    'content': fact_content.strip(),
+                    'confidence': 0.7
+                })
             
-            for fact_type, patterns in fact_patterns.items():
-                for pattern in patterns:
-                    if pattern in message_lower:
-                        # Extract the relevant part of the sentence
-                        start_idx = message_lower.find(pattern)
-                        fact_content = user_message[start_idx:start_idx + 100]  # Get context
-                        facts_found.append({
-                            'type': fact_type,
-                            'content': fact_content.strip(),
-                            'confidence': 0.7
-                        })
-                        break
-            
-            # Store facts in database
+            # Batch-upsert facts: ON CONFLICT updates in place instead of the
+            # delete+insert churn INSERT OR REPLACE causes
             if facts_found:
-                conn = sqlite3.connect(self.memory_db_path)
-                cursor = conn.cursor()
-                
-                for fact in facts_found:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO user_facts 
+                rows = [
+                    (user_id, fact['type'], fact['content'], fact['confidence'])
+                    for fact in facts_found
+                ]
+                async with self.get_db_connection() as conn:
+                    await conn.executemany('''
+                        INSERT INTO user_facts
                         (user_id, fact_type, fact_content, confidence)
                         VALUES (?, ?, ?, ?)
-                    ''', (user_id, fact['type'], fact['content'], fact['confidence']))
-                
-                conn.commit()
-                conn.close()
+                        ON CONFLICT(user_id, fact_type, fact_content)
+                        DO UPDATE SET confidence = excluded.confidence,
+                                      last_updated = CURRENT_TIMESTAMP
+                    ''', rows)
+                    await conn.commit()
                 
         except Exception as e:
             logger.error(f"Error extracting user facts: {e}")
@@ -319,19 +591,15 @@ RESPONSE GUIDELINES:
     async def get_conversation_history(self, user_id: int, limit: int = 10) -> List[Dict]:
         """Get recent conversation history"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT message_type, content, timestamp
-                FROM conversation_memory
-                WHERE user_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (user_id, limit * 2))  # Get more to account for user/assistant pairs
-            
-            history = cursor.fetchall()
-            conn.close()
+            async with self.get_db_connection() as conn:
+                cursor = await conn.execute('''
+                    SELECT message_type, content, timestamp
+                    FROM conversation_memory
+                    WHERE user_id = ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                ''', (user_id, limit * 2))  # Get more to account for user/assistant pairs
+                history = await cursor.fetchall()
             
             # Convert to list of dicts and reverse to chronological order
             return [{'message_type': msg[0], 'content': msg[1], 'timestamp': msg[2]} 
@@ -354,38 +622,34 @@ RESPONSE GUIDELINES:
 
     def get_primary_persona(self, persona_labels: Dict) -> str:
         """Get the primary persona from labels"""
-        if not persona_labels:
-            return "balanced traveler"
-        
-        primary = max(persona_labels.items(), key=lambda x: x[1])
-        return f"{primary[0]} (score: {primary[1]:.2f})"
+        return _primary_persona_cached(frozenset(persona_labels.items()) if persona_labels else frozenset())
 
     def format_category_preferences(self, category_prefs: Dict) -> str:
         """Format category preferences for prompt"""
-        if not category_prefs:
-            return "no specific preferences"
-        
-        top_categories = sorted(category_prefs.items(), key=lambda x: x[1], reverse=True)[:3]
-        return ", ".join([f"{cat} ({score:.2f})" for cat, score in top_categories])
+        return _category_preferences_cached(frozenset(category_prefs.items()) if category_prefs else frozenset())
 
     async def add_poi_knowledge(self, poi_id: int, poi_name: str, description: str, tips: str = ""):
         """Add POI knowledge to the chatbot's knowledge base"""
         try:
             # Create embedding for POI information
             poi_text = f"{poi_name} {description} {tips}".strip()
-            embedding = self.embedding_model.encode(poi_text).tobytes()
-            
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO poi_knowledge 
-                (poi_id, poi_name, description, tips, embedding)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (poi_id, poi_name, description, tips, embedding))
-            
-            conn.commit()
-            conn.close()
+            embedding = quantize_embedding(self.embedding_model.encode(poi_text, normalize_embeddings=True))
+            
+            async with self.get_db_connection() as conn:
+                await conn.execute('''
+                    INSERT OR REPLACE INTO poi_knowledge
+                    (poi_id, poi_name, description, tips, embedding)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (poi_id, poi_name, description, tips, embedding))
+                await conn.commit()
+
+            # Keep the vector index in sync with SQLite
+            if poi_id is not None:
+                vector = np.frombuffer(embedding, dtype=np.int8).astype(np.float32) * INT8_EMBEDDING_SCALE
+                self.poi_index.add_with_ids(
+                    vector.reshape(1, -1),
+                    np.array([poi_id], dtype=np.int64)
+                )
             
         except Exception as e:
             logger.error(f"Error adding POI knowledge: {e}")
@@ -393,17 +657,13 @@ RESPONSE GUIDELINES:
     async def cleanup_old_memories(self, max_age_hours: int = 168):  # 1 week default
         """Clean up old conversation memories"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                DELETE FROM conversation_memory 
-                WHERE datetime(timestamp) < datetime('now', '-' || ? || ' hours')
-            ''', (max_age_hours,))
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            async with self.get_db_connection() as conn:
+                cursor = await conn.execute('''
+                    DELETE FROM conversation_memory
+                    WHERE datetime(timestamp) < datetime('now', '-' || ? || ' hours')
+                ''', (max_age_hours,))
+                deleted_count = cursor.rowcount
+                await conn.commit()
             
             logger.info(f"Cleaned up {deleted_count} old conversation memories")
             
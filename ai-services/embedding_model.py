@@ -0,0 +1,96 @@
+"""
+Embedding model loader for AI Travel Companion
+Prefers an int8-quantized ONNX Runtime export of all-MiniLM-L6-v2 for
+faster CPU inference, falling back to the PyTorch SentenceTransformer
+when optimum/onnxruntime are unavailable
+"""
+
+import os
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ONNX Runtime integration
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+ONNX_MODEL_DIR = 'data/minilm-onnx-int8'
+QUANTIZED_MODEL_FILE = 'model_quantized.onnx'
+
+
+class OnnxEmbeddingModel:
+    """SentenceTransformer-compatible encoder backed by int8 ONNX Runtime
+
+    Exposes the same encode(texts, batch_size, convert_to_numpy,
+    normalize_embeddings) surface the chatbot already uses, so call sites
+    don't change.
+    """
+
+    def __init__(self):
+        os.makedirs('data', exist_ok=True)
+        if not os.path.exists(os.path.join(ONNX_MODEL_DIR, QUANTIZED_MODEL_FILE)):
+            self._export_and_quantize()
+
+        self.tokenizer = AutoTokenizer.from_pretrained(ONNX_MODEL_DIR)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            ONNX_MODEL_DIR,
+            file_name=QUANTIZED_MODEL_FILE,
+            provider='CPUExecutionProvider'
+        )
+
+    def _export_and_quantize(self):
+        """One-time export to ONNX with int8 dynamic weight quantization"""
+        logger.info(f"Exporting {MODEL_NAME} to int8 ONNX (one-time setup)")
+        model = ORTModelForFeatureExtraction.from_pretrained(MODEL_NAME, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        model.save_pretrained(ONNX_MODEL_DIR)
+        tokenizer.save_pretrained(ONNX_MODEL_DIR)
+
+        quantizer = ORTQuantizer.from_pretrained(ONNX_MODEL_DIR)
+        quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=ONNX_MODEL_DIR, quantization_config=quantization_config)
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False) -> np.ndarray:
+        """Encode text(s) with mean pooling, mirroring SentenceTransformer"""
+        single_input = isinstance(texts, str)
+        if single_input:
+            texts = [texts]
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            inputs = self.tokenizer(batch, padding=True, truncation=True, return_tensors='np')
+            outputs = self.model(**inputs)
+
+            # Mean pooling over non-padding tokens
+            token_embeddings = np.asarray(outputs.last_hidden_state)
+            attention_mask = inputs['attention_mask'][:, :, None].astype(np.float32)
+            pooled = (token_embeddings * attention_mask).sum(axis=1)
+            pooled /= np.clip(attention_mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled)
+
+        embeddings = np.concatenate(batches).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+
+        return embeddings[0] if single_input else embeddings
+
+
+def load_embedding_model():
+    """Load the fastest available embedding model for this environment"""
+    if ONNX_AVAILABLE:
+        try:
+            return OnnxEmbeddingModel()
+        except Exception as e:
+            logger.warning(f"ONNX embedding model unavailable, falling back to PyTorch: {e}")
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer('all-MiniLM-L6-v2')
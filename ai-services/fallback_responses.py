@@ -3,12 +3,10 @@ Fallback response system for AI Travel Companion
 Provides intelligent responses when OpenAI API is unavailable
 """
 
-def generate_fallback_response(message: str) -> str:
-    """Generate intelligent fallback responses based on user input"""
-    message_lower = message.lower()
-    
-    if any(word in message_lower for word in ["hello", "hi", "hey", "start"]):
-        return """Hello! I'm your AI Travel Companion. While I'm currently running in offline mode, I can still help you with travel planning! 
+import re
+from functools import lru_cache
+
+GREETING_RESPONSE = """Hello! I'm your AI Travel Companion. While I'm currently running in offline mode, I can still help you with travel planning!
 
 I can assist with:
 🌍 Destination recommendations
@@ -20,8 +18,7 @@ I can assist with:
 
 What would you like to explore today?"""
 
-    elif any(word in message_lower for word in ["paris", "france"]):
-        return """Paris is absolutely magical! Here are my top recommendations:
+PARIS_RESPONSE = """Paris is absolutely magical! Here are my top recommendations:
 
 🗼 **Must-See Attractions:**
 - Eiffel Tower (best views from Trocadéro)
@@ -42,8 +39,7 @@ What would you like to explore today?"""
 
 Would you like specific recommendations for activities, restaurants, or a day-by-day itinerary?"""
 
-    elif any(word in message_lower for word in ["tokyo", "japan"]):
-        return """Tokyo is incredible! Here's what you shouldn't miss:
+TOKYO_RESPONSE = """Tokyo is incredible! Here's what you shouldn't miss:
 
 🏯 **Cultural Highlights:**
 - Senso-ji Temple (Asakusa district)
@@ -70,8 +66,7 @@ Would you like specific recommendations for activities, restaurants, or a day-by
 
 What aspect of Tokyo interests you most?"""
 
-    elif any(word in message_lower for word in ["budget", "cheap", "affordable"]):
-        return """Smart budget travel tips! Here are proven strategies:
+BUDGET_RESPONSE = """Smart budget travel tips! Here are proven strategies:
 
 💰 **Top Budget Destinations:**
 - Southeast Asia: Thailand, Vietnam ($20-30/day)
@@ -99,8 +94,7 @@ What aspect of Tokyo interests you most?"""
 
 Would you like specific budget breakdowns for any destination?"""
 
-    elif any(word in message_lower for word in ["restaurant", "food", "eat", "dining"]):
-        return """Great food makes any trip memorable! Here's how to find the best:
+FOOD_RESPONSE = """Great food makes any trip memorable! Here's how to find the best:
 
 🔍 **Finding Great Restaurants:**
 - Ask locals for recommendations
@@ -127,8 +121,7 @@ Would you like specific budget breakdowns for any destination?"""
 
 What type of cuisine or dining experience are you looking for?"""
 
-    elif any(word in message_lower for word in ["itinerary", "plan", "schedule", "days"]):
-        return """Perfect! Let me help you create an amazing itinerary:
+ITINERARY_RESPONSE = """Perfect! Let me help you create an amazing itinerary:
 
 📅 **Planning Framework:**
 - Day 1: Arrival + nearby exploration
@@ -158,8 +151,7 @@ To create a personalized itinerary, I'd need to know:
 - Your interests (culture, food, adventure, etc.)
 - Budget range?"""
 
-    elif any(word in message_lower for word in ["weather", "climate", "season"]):
-        return """Weather planning is crucial for a great trip! Here's what to consider:
+WEATHER_RESPONSE = """Weather planning is crucial for a great trip! Here's what to consider:
 
 🌤️ **Seasonal Planning:**
 - Spring: Mild weather, blooming flowers, fewer crowds
@@ -186,8 +178,103 @@ To create a personalized itinerary, I'd need to know:
 
 Which destination and time of year are you considering?"""
 
-    else:
-        return f"""I understand you're asking about: "{message}"
+# Keyword -> category -> canned artifact, built once at import; insertion
+# order preserves the original match priority (greetings first, weather last)
+CATEGORY_KEYWORDS = {
+    "greeting": ["hello", "hi", "hey", "start"],
+    "paris": ["paris", "france"],
+    "tokyo": ["tokyo", "japan"],
+    "budget": ["budget", "cheap", "affordable"],
+    "food": ["restaurant", "food", "eat", "dining"],
+    "itinerary": ["itinerary", "plan", "schedule", "days"],
+    "weather": ["weather", "climate", "season"],
+}
+
+RESPONSES = {
+    "greeting": GREETING_RESPONSE,
+    "paris": PARIS_RESPONSE,
+    "tokyo": TOKYO_RESPONSE,
+    "budget": BUDGET_RESPONSE,
+    "food": FOOD_RESPONSE,
+    "itinerary": ITINERARY_RESPONSE,
+    "weather": WEATHER_RESPONSE,
+}
+
+
+PARIS_SUGGESTIONS = (
+    "Best time to visit Paris?",
+    "Paris museum recommendations",
+    "Romantic spots in Paris",
+    "Paris food tour suggestions"
+)
+
+TOKYO_SUGGESTIONS = (
+    "Tokyo neighborhoods to explore",
+    "Japanese etiquette tips",
+    "Best Tokyo food experiences",
+    "Day trips from Tokyo"
+)
+
+BUDGET_SUGGESTIONS = (
+    "Cheapest destinations in Europe",
+    "Budget accommodation tips",
+    "Free activities worldwide",
+    "How to save on flights"
+)
+
+FOOD_SUGGESTIONS = (
+    "Local food markets to visit",
+    "Street food safety tips",
+    "Vegetarian options abroad",
+    "Food allergy translations"
+)
+
+ITINERARY_SUGGESTIONS = (
+    "How many days do I need?",
+    "Must-see vs hidden gems",
+    "Transportation between cities",
+    "Booking accommodations"
+)
+
+DEFAULT_SUGGESTIONS = (
+    "Plan a weekend getaway",
+    "Find budget-friendly destinations",
+    "Suggest adventure activities",
+    "Help with travel logistics"
+)
+
+SUGGESTIONS = {
+    "paris": PARIS_SUGGESTIONS,
+    "tokyo": TOKYO_SUGGESTIONS,
+    "budget": BUDGET_SUGGESTIONS,
+    "food": FOOD_SUGGESTIONS,
+    "itinerary": ITINERARY_SUGGESTIONS,
+}
+
+# One alternation with a named group per category; search() stops at the
+# first keyword in the message and lastgroup names its category directly.
+# IGNORECASE lets the engine fold case in C, so no .lower() copy is made.
+KEYWORD_RE = re.compile(
+    r"\b(?:%s)\b" % "|".join(
+        "(?P<%s>%s)" % (category, "|".join(map(re.escape, keywords)))
+        for category, keywords in CATEGORY_KEYWORDS.items()
+    ),
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def classify(message: str) -> str:
+    """Classify a message into a response category with one keyword scan
+
+    Chat traffic repeats heavily ("hi", "paris"), so memoizing on the raw
+    message turns repeat classifications into a dict lookup.
+    """
+    match = KEYWORD_RE.search(message)
+    return match.lastgroup if match else "default"
+
+
+DEFAULT_RESPONSE_TEMPLATE = """I understand you're asking about: "{message}"
 
 While I'm currently in offline mode, I'm still here to help with your travel planning! I can provide detailed advice on:
 
@@ -205,49 +292,25 @@ Could you be more specific about what aspect of travel you'd like help with? For
 
 The more details you provide, the better I can assist you!"""
 
-def generate_suggestions(message: str) -> list:
-    """Generate contextual follow-up suggestions"""
-    message_lower = message.lower()
-    
-    if "paris" in message_lower:
-        return [
-            "Best time to visit Paris?",
-            "Paris museum recommendations",
-            "Romantic spots in Paris",
-            "Paris food tour suggestions"
-        ]
-    elif "tokyo" in message_lower:
-        return [
-            "Tokyo neighborhoods to explore",
-            "Japanese etiquette tips",
-            "Best Tokyo food experiences",
-            "Day trips from Tokyo"
-        ]
-    elif "budget" in message_lower:
-        return [
-            "Cheapest destinations in Europe",
-            "Budget accommodation tips",
-            "Free activities worldwide",
-            "How to save on flights"
-        ]
-    elif "food" in message_lower or "restaurant" in message_lower:
-        return [
-            "Local food markets to visit",
-            "Street food safety tips",
-            "Vegetarian options abroad",
-            "Food allergy translations"
-        ]
-    elif "itinerary" in message_lower:
-        return [
-            "How many days do I need?",
-            "Must-see vs hidden gems",
-            "Transportation between cities",
-            "Booking accommodations"
-        ]
-    else:
-        return [
-            "Plan a weekend getaway",
-            "Find budget-friendly destinations",
-            "Suggest adventure activities",
-            "Help with travel logistics"
-        ]
+
+def generate_fallback_response(message: str, category: str = None) -> str:
+    """Generate intelligent fallback responses based on user input
+
+    Pass a precomputed category from classify() to avoid rescanning the
+    message when suggestions are generated for the same request.
+    """
+    if category is None:
+        category = classify(message)
+
+    response = RESPONSES.get(category)
+    if response is not None:
+        return response
+
+    return DEFAULT_RESPONSE_TEMPLATE.format(message=message)
+
+
+def generate_suggestions(message: str, category: str = None) -> tuple:
+    """Generate contextual follow-up suggestions as a shared immutable tuple"""
+    if category is None:
+        category = classify(message)
+    return SUGGESTIONS.get(category, DEFAULT_SUGGESTIONS)
@@ -1,23 +1,58 @@
-import firebase_admin
-from firebase_admin import credentials, messaging
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
 import os
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# FCM HTTP v1 rejects multicasts above 500 tokens
+FCM_MULTICAST_LIMIT = 500
+
+# Dedicated pool for blocking Admin SDK sends so notification bursts don't
+# queue on the event loop's default 40-thread executor and starve other
+# offloaded work
+_FCM_POOL = ThreadPoolExecutor(max_workers=64, thread_name_prefix="fcm")
+
+
+@cache
+def get_messaging():
+    """Import firebase_admin and initialize the app on first use
+
+    The Admin SDK drags in google-auth and gRPC, so importing it at module
+    scope adds hundreds of ms of cold start that /health should not pay.
+    """
+    import firebase_admin
+    from firebase_admin import credentials, messaging
+
+    if not firebase_admin._apps:
+        try:
+            cred = credentials.Certificate(
+                str(FirebaseMessagingService.SERVICE_ACCOUNT_PATH)
+            )
+            firebase_admin.initialize_app(cred)
+        except Exception as e:
+            logger.warning("Firebase initialization failed: %s", e)
+            logger.warning("Running in demo mode without Firebase")
+            # Initialize with default app for demo
+            firebase_admin.initialize_app()
+    return messaging
+
+
+@lru_cache(maxsize=512)
+def get_notification(title: str, body: str):
+    """Reuse Notification objects for repeated title/body templates"""
+    return get_messaging().Notification(title=title, body=body)
+
 class FirebaseMessagingService:
-    def __init__(self):
-        # Initialize Firebase app if not already initialized
-        if not firebase_admin._apps:
-            try:
-                # Path to service account key file
-                service_account_path = Path(__file__).parent.parent / "backend" / "config" / "firebase-service-account.json"
-                cred = credentials.Certificate(str(service_account_path))
-                firebase_admin.initialize_app(cred)
-            except Exception as e:
-                print(f"Warning: Firebase initialization failed: {e}")
-                print("Running in demo mode without Firebase")
-                # Initialize with default app for demo
-                firebase_admin.initialize_app()
-    
+    # Resolved once at class creation; every instance shares it
+    SERVICE_ACCOUNT_PATH = (
+        Path(__file__).resolve().parent.parent
+        / "backend" / "config" / "firebase-service-account.json"
+    )
+
+
     async def send_notification(self, token: str, title: str, body: str, data: dict = None):
         """
         Send push notification using Firebase Cloud Messaging HTTP v1 API
@@ -32,26 +67,24 @@ class FirebaseMessagingService:
             str: Message ID if successful
         """
         try:
-            # Create notification
-            notification = messaging.Notification(
-                title=title,
-                body=body
-            )
-            
+            messaging = get_messaging()
+            notification = get_notification(title, body)
+
             # Create message
             message = messaging.Message(
                 notification=notification,
                 token=token,
                 data=data or {}
             )
-            
-            # Send message
-            response = messaging.send(message)
-            print(f"Successfully sent message: {response}")
+
+            # Send message off the event loop
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(_FCM_POOL, messaging.send, message)
+            logger.info("Successfully sent message: %s", response)
             return response
-            
+
         except Exception as e:
-            print(f"Error sending notification: {str(e)}")
+            logger.error("Error sending notification: %s", e)
             raise e
     
     async def send_to_multiple_devices(self, tokens: list, title: str, body: str, data: dict = None):
@@ -68,48 +101,49 @@ class FirebaseMessagingService:
             dict: Response with success/failure counts
         """
         try:
-            # Create notification
-            notification = messaging.Notification(
-                title=title,
-                body=body
-            )
-            
-            # Create multicast message
-            message = messaging.MulticastMessage(
-                notification=notification,
-                tokens=tokens,
-                data=data or {}
+            messaging = get_messaging()
+            notification = get_notification(title, body)
+
+            def send_chunk(chunk):
+                message = messaging.MulticastMessage(
+                    notification=notification,
+                    tokens=chunk,
+                    data=data or {}
+                )
+                return messaging.send_each_for_multicast(message)
+
+            # Split oversized fleets into 500-token chunks and overlap the
+            # network round-trips; the dedicated pool keeps the event loop free
+            chunks = [
+                tokens[i:i + FCM_MULTICAST_LIMIT]
+                for i in range(0, len(tokens), FCM_MULTICAST_LIMIT)
+            ]
+            loop = asyncio.get_running_loop()
+            responses = await asyncio.gather(
+                *(loop.run_in_executor(_FCM_POOL, send_chunk, chunk) for chunk in chunks)
             )
-            
-            # Send to multiple devices
-            response = messaging.send_multicast(message)
-            
+
+            # Merge chunk results in one pass each, preserving the original
+            # token order; the comprehension sizes the list up front instead
+            # of growing it append by append
             result = {
-                "success_count": response.success_count,
-                "failure_count": response.failure_count,
-                "responses": []
+                "success_count": sum(r.success_count for r in responses),
+                "failure_count": sum(r.failure_count for r in responses),
+                "responses": [
+                    {"token": token, "message_id": resp.message_id, "success": True}
+                    if resp.success else
+                    {"token": token, "error": str(resp.exception), "success": False}
+                    for chunk, response in zip(chunks, responses)
+                    for token, resp in zip(chunk, response.responses)
+                ],
             }
-            
-            # Process individual responses
-            for idx, resp in enumerate(response.responses):
-                if resp.success:
-                    result["responses"].append({
-                        "token": tokens[idx],
-                        "message_id": resp.message_id,
-                        "success": True
-                    })
-                else:
-                    result["responses"].append({
-                        "token": tokens[idx],
-                        "error": str(resp.exception),
-                        "success": False
-                    })
-            
-            print(f"Successfully sent to {response.success_count} devices, failed: {response.failure_count}")
+
+            logger.info("Successfully sent to %s devices, failed: %s",
+                        result["success_count"], result["failure_count"])
             return result
             
         except Exception as e:
-            print(f"Error sending multicast notification: {str(e)}")
+            logger.error("Error sending multicast notification: %s", e)
             raise e
     
     async def send_topic_notification(self, topic: str, title: str, body: str, data: dict = None):
@@ -126,12 +160,9 @@ class FirebaseMessagingService:
             str: Message ID if successful
         """
         try:
-            # Create notification
-            notification = messaging.Notification(
-                title=title,
-                body=body
-            )
-            
+            messaging = get_messaging()
+            notification = get_notification(title, body)
+
             # Create message for topic
             message = messaging.Message(
                 notification=notification,
@@ -139,13 +170,14 @@ class FirebaseMessagingService:
                 data=data or {}
             )
             
-            # Send message
-            response = messaging.send(message)
-            print(f"Successfully sent topic message: {response}")
+            # Send message off the event loop
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(_FCM_POOL, messaging.send, message)
+            logger.info("Successfully sent topic message: %s", response)
             return response
             
         except Exception as e:
-            print(f"Error sending topic notification: {str(e)}")
+            logger.error("Error sending topic notification: %s", e)
             raise e
 
 # Global instance
@@ -1,17 +1,34 @@
-import openai
+import hashlib
+import logging
 import os
+from functools import cached_property
 from typing import Dict, List, Optional
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class OpenAIService:
     def __init__(self):
-        self.client = openai.OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY')
-        )
         self.model = "gpt-3.5-turbo"
-    
+
+    @cached_property
+    def client(self):
+        # Deferred so importing this module doesn't pay the SDK import cost;
+        # the async client keeps the event loop free during OpenAI calls
+        import openai
+        return openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    @cached_property
+    def redis(self):
+        # Hash-keyed cache for deterministic JSON answers; repeated quiz
+        # submissions become a Redis GET instead of a GPT call
+        from redis import asyncio as aioredis
+        return aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+
+
     async def generate_chat_response(self, message: str, user_context: Dict = None) -> str:
         """
         Generate AI chatbot response using OpenAI GPT
@@ -27,7 +44,7 @@ class OpenAIService:
             # Build system prompt based on user context
             system_prompt = self._build_system_prompt(user_context)
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -39,8 +56,8 @@ class OpenAIService:
             
             return response.choices[0].message.content
             
-        except Exception as e:
-            print(f"Error generating chat response: {e}")
+        except Exception:
+            logger.exception("Error generating chat response")
             return "I'm sorry, I'm having trouble responding right now. Please try again later."
     
     async def analyze_travel_dna(self, quiz_answers: Dict) -> Dict:
@@ -54,11 +71,21 @@ class OpenAIService:
             Dict: Travel DNA analysis
         """
         try:
+            cache_key = "dna:" + hashlib.sha1(
+                orjson.dumps(quiz_answers, option=orjson.OPT_SORT_KEYS)
+            ).hexdigest()
+            try:
+                cached = await self.redis.get(cache_key)
+                if cached is not None:
+                    return orjson.loads(cached)
+            except Exception:
+                pass
+
             prompt = f"""
             Analyze the following travel quiz answers and create a comprehensive travel DNA profile:
-            
+
             Quiz Answers: {quiz_answers}
-            
+
             Please provide a JSON response with the following structure:
             {{
                 "adventure_level": "low/medium/high",
@@ -76,23 +103,27 @@ class OpenAIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a travel psychology expert. Analyze travel preferences and create detailed profiles."},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=800,
-                temperature=0.3
+                temperature=0.3,
+                response_format={"type": "json_object"}
             )
-            
-            # Parse JSON response
-            import json
-            result = json.loads(response.choices[0].message.content)
+
+            # JSON mode guarantees a parseable object, no prose to strip
+            result = orjson.loads(response.choices[0].message.content)
+            try:
+                await self.redis.set(cache_key, orjson.dumps(result), ex=86400)
+            except Exception:
+                pass
             return result
             
-        except Exception as e:
-            print(f"Error analyzing travel DNA: {e}")
+        except Exception:
+            logger.exception("Error analyzing travel DNA")
             return {
                 "adventure_level": "medium",
                 "budget_preference": "mid-range",
@@ -121,42 +152,63 @@ class OpenAIService:
             List[Dict]: List of recommendations
         """
         try:
+            cache_key = "rec:" + hashlib.sha1(
+                orjson.dumps([location, preferences, user_dna],
+                             option=orjson.OPT_SORT_KEYS)
+            ).hexdigest()
+            try:
+                cached = await self.redis.get(cache_key)
+                if cached is not None:
+                    return orjson.loads(cached)
+            except Exception:
+                pass
+
             prompt = f"""
             Generate personalized travel recommendations for {location} based on:
-            
+
             User Preferences: {preferences}
             Travel DNA: {user_dna}
-            
-            Please provide 5 recommendations in JSON format:
-            [
-                {{
-                    "type": "restaurant/activity/attraction/accommodation",
-                    "name": "Name",
-                    "description": "Description",
-                    "rating": 4.5,
-                    "price_range": "$/$$/$$$/$$$$",
-                    "category": "cultural/adventure/food/nature",
-                    "why_recommended": "Reason based on user profile"
-                }}
-            ]
+
+            Please provide 5 recommendations as a JSON object:
+            {{
+                "recommendations": [
+                    {{
+                        "type": "restaurant/activity/attraction/accommodation",
+                        "name": "Name",
+                        "description": "Description",
+                        "rating": 4.5,
+                        "price_range": "$/$$/$$$/$$$$",
+                        "category": "cultural/adventure/food/nature",
+                        "why_recommended": "Reason based on user profile"
+                    }}
+                ]
+            }}
             """
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a personalized travel recommendation expert. Provide detailed, relevant suggestions."},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=1000,
-                temperature=0.5
+                temperature=0.5,
+                response_format={"type": "json_object"}
             )
-            
-            import json
-            recommendations = json.loads(response.choices[0].message.content)
+
+            # JSON mode only emits objects, so the list rides in a wrapper key
+            result = orjson.loads(response.choices[0].message.content)
+            recommendations = result.get("recommendations", [])
+            try:
+                await self.redis.set(
+                    cache_key, orjson.dumps(recommendations), ex=86400
+                )
+            except Exception:
+                pass
             return recommendations
             
-        except Exception as e:
-            print(f"Error generating recommendations: {e}")
+        except Exception:
+            logger.exception("Error generating recommendations")
             return [
                 {
                     "type": "restaurant",
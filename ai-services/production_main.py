@@ -6,20 +6,29 @@ Real OpenAI integration with proper error handling and production features
 import os
 import logging
 from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache
 import asyncio
 import json
+import operator
+import threading
+import time
 
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+import hashlib
+
 import openai
-from openai import OpenAI
 import httpx
+import tiktoken
 import uvicorn
+from prometheus_client import Counter, Histogram, make_asgi_app
+from redis import asyncio as aioredis
 from dotenv import load_dotenv
-from fallback_responses import generate_fallback_response, generate_suggestions
+from fallback_responses import classify, generate_fallback_response, generate_suggestions
 
 # Load environment variables
 load_dotenv()
@@ -35,18 +44,64 @@ logger = logging.getLogger(__name__)
 NVIDIA_API_KEY = "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"
 
 logger.info("Using NVIDIA NIM API")
-openai_client = OpenAI(
-    api_key=NVIDIA_API_KEY,
-    base_url="https://integrate.api.nvidia.com/v1"
-)
 AI_MODEL = "openai/gpt-oss-20b"
 
+async def _clock_ticker(app):
+    """Refresh the shared second-resolution timestamp string"""
+    while True:
+        await asyncio.sleep(1)
+        app.state.now_iso = datetime.now().isoformat()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared HTTP/2 pool behind the async OpenAI client: LLM round-trips
+    # await instead of blocking the event loop, and keep-alive connections
+    # skip the per-call TLS handshake to NVIDIA NIM
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+    )
+    app.state.ai = openai.AsyncOpenAI(
+        api_key=NVIDIA_API_KEY,
+        base_url="https://integrate.api.nvidia.com/v1",
+        http_client=app.state.http
+    )
+    # Response cache: repeat questions become a Redis GET instead of a
+    # multi-second NIM call
+    app.state.redis = aioredis.from_url(
+        os.getenv("REDIS_URL", "redis://localhost:6379")
+    )
+    # One datetime/isoformat per second instead of one per request
+    app.state.now_iso = datetime.now().isoformat()
+    clock_task = asyncio.create_task(_clock_ticker(app))
+    # Warm the five per-DNA-type recommendation entries so the first
+    # quiz completions hit Redis instead of the LLM
+    warm_task = asyncio.create_task(_warm_dna_recommendations())
+    yield
+    warm_task.cancel()
+    clock_task.cancel()
+    await app.state.redis.aclose()
+    await app.state.http.aclose()
+
 app = FastAPI(
     title="AI Travel Companion Service",
     description="Production-grade AI service for travel recommendations and chat",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Observability: where the p99 goes (NIM vs local) and how often each
+# cache layer saves a call. Observations cost nanoseconds.
+LLM_SECONDS = Histogram(
+    "llm_call_seconds", "NVIDIA NIM call latency", ["endpoint"]
+)
+CACHE_HITS = Counter(
+    "cache_hits_total", "Chat cache lookups by outcome", ["layer"]
+)
+app.mount("/metrics", make_asgi_app())
+
 # CORS configuration for production
 app.add_middleware(
     CORSMiddleware,
@@ -61,26 +116,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Request/Response Models
+# Request/Response Models. extra="ignore" skips unknown-field handling
+# on the hot validation path; mutable defaults go through default_factory
+# so Pydantic doesn't deep-copy a shared list per request.
+REQUEST_MODEL_CONFIG = ConfigDict(extra="ignore")
+
 class ChatMessage(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     role: str = Field(..., description="Message role: user, assistant, or system")
     content: str = Field(..., description="Message content")
-    timestamp: Optional[datetime] = Field(default_factory=datetime.now)
+    # Unix float is cheaper to build and serialize than a datetime
+    timestamp: Optional[float] = Field(default_factory=time.time)
 
 class ChatRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     message: str = Field(..., description="User message")
     user_id: Optional[str] = Field(None, description="Optional user ID for context")
-    conversation_history: Optional[List[ChatMessage]] = Field(default=[], description="Previous messages")
+    conversation_history: Optional[List[ChatMessage]] = Field(default_factory=list, description="Previous messages")
     location: Optional[Dict[str, float]] = Field(None, description="User location {lat, lng}")
     preferences: Optional[Dict[str, Any]] = Field(None, description="User travel preferences")
 
 class ChatResponse(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     response: str = Field(..., description="AI response")
     conversation_id: Optional[str] = Field(None, description="Conversation identifier")
-    suggestions: Optional[List[str]] = Field(default=[], description="Follow-up suggestions")
-    places: Optional[List[Dict[str, Any]]] = Field(default=[], description="Recommended places")
+    suggestions: Optional[List[str]] = Field(default_factory=list, description="Follow-up suggestions")
+    places: Optional[List[Dict[str, Any]]] = Field(default_factory=list, description="Recommended places")
 
 class TravelDNARequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     answers: Dict[str, Any] = Field(..., description="Quiz answers")
     user_id: Optional[str] = Field(None, description="User ID")
 
@@ -119,48 +187,59 @@ TRAVEL_DNA_TYPES = {
     }
 }
 
+# Scoring table built once at import: question -> answer -> DNA weights.
+# Adding a question or answer is a data edit, not new branches.
+DNA_SCORING = {
+    "budget_preference": {
+        "luxury": {"luxury_traveler": 3},
+        "budget": {"budget_backpacker": 3},
+        "mid_range": {"culture_seeker": 1, "explorer": 1},
+    },
+    "activity_preference": {
+        "adventure": {"explorer": 3},
+        "cultural": {"culture_seeker": 3},
+        "relaxation": {"relaxation_seeker": 3},
+        "luxury": {"luxury_traveler": 2},
+    },
+    "accommodation_style": {
+        "luxury_hotel": {"luxury_traveler": 2},
+        "boutique": {"culture_seeker": 2},
+        "hostel": {"budget_backpacker": 2},
+        "unique": {"explorer": 2},
+    },
+    "planning_style": {
+        "detailed": {"luxury_traveler": 1},
+        "flexible": {"explorer": 2},
+        "spontaneous": {"budget_backpacker": 1},
+    },
+}
+
+_EMPTY_WEIGHTS = {}
+_ZERO_SCORES = dict.fromkeys(TRAVEL_DNA_TYPES, 0)
+_SCORE_VALUE = operator.itemgetter(1)
+
 def analyze_travel_dna(answers: Dict[str, Any]) -> Dict[str, Any]:
     """Analyze user answers to determine travel DNA type"""
-    scores = {dna_type: 0 for dna_type in TRAVEL_DNA_TYPES.keys()}
-    
-    # Scoring logic based on answers
+    # .copy() of the prebuilt zero dict beats rebuilding it per call
+    scores = _ZERO_SCORES.copy()
+
     for question, answer in answers.items():
-        if question == "budget_preference":
-            if answer == "luxury": scores["luxury_traveler"] += 3
-            elif answer == "budget": scores["budget_backpacker"] += 3
-            elif answer == "mid_range": 
-                scores["culture_seeker"] += 1
-                scores["explorer"] += 1
-                
-        elif question == "activity_preference":
-            if answer == "adventure": scores["explorer"] += 3
-            elif answer == "cultural": scores["culture_seeker"] += 3
-            elif answer == "relaxation": scores["relaxation_seeker"] += 3
-            elif answer == "luxury": scores["luxury_traveler"] += 2
-            
-        elif question == "accommodation_style":
-            if answer == "luxury_hotel": scores["luxury_traveler"] += 2
-            elif answer == "boutique": scores["culture_seeker"] += 2
-            elif answer == "hostel": scores["budget_backpacker"] += 2
-            elif answer == "unique": scores["explorer"] += 2
-            
-        elif question == "planning_style":
-            if answer == "detailed": scores["luxury_traveler"] += 1
-            elif answer == "flexible": scores["explorer"] += 2
-            elif answer == "spontaneous": scores["budget_backpacker"] += 1
-    
-    # Determine primary DNA type
-    primary_dna = max(scores, key=scores.get)
-    
+        weights = DNA_SCORING.get(question, _EMPTY_WEIGHTS).get(answer)
+        if weights:
+            for dna_type, weight in weights.items():
+                scores[dna_type] += weight
+
+    # Determine primary DNA type; itemgetter keeps the key lookup in C
+    primary_dna = max(scores.items(), key=_SCORE_VALUE)[0]
+    total = sum(scores.values())
+
     return {
         "dna_type": primary_dna,
         "scores": scores,
-        "confidence": scores[primary_dna] / sum(scores.values()) if sum(scores.values()) > 0 else 0
+        "confidence": scores[primary_dna] / total if total > 0 else 0
     }
 
-def get_travel_system_prompt(context=None):
-    """Generate system prompt for travel assistant"""
-    base_prompt = """You are an expert AI travel companion with deep knowledge of global destinations, local cultures, and travel logistics. You provide personalized, practical, and engaging travel advice.
+BASE_TRAVEL_PROMPT = """You are an expert AI travel companion with deep knowledge of global destinations, local cultures, and travel logistics. You provide personalized, practical, and engaging travel advice.
 
 CRITICAL FORMATTING RULES:
 - Use simple, clean formatting that renders well in web interfaces
@@ -193,17 +272,53 @@ Always structure your responses with clear sections and simple formatting.
     Always be helpful, accurate, and considerate of budget constraints and personal preferences.
     Provide specific, actionable recommendations with practical details like addresses, prices, and timing.
 """
-    
+
+@lru_cache(maxsize=4096)
+def _render_travel_prompt(loc_key, prefs_key):
+    """Render the prompt for one (location bucket, canonical prefs) pair
+
+    The variable suffix has low cardinality per user, so the lru_cache
+    removes the per-request string building and pretty-printed dumps.
+    """
+    prompt = BASE_TRAVEL_PROMPT
+    if loc_key:
+        prompt += f"\n\nUser's current location: {loc_key[0]}, {loc_key[1]}"
+    if prefs_key:
+        # prefs_key is already canonical compact JSON; pretty-printing it
+        # only added prompt tokens
+        prompt += f"\n\nUser preferences: {prefs_key}"
+    return prompt
+
+def get_travel_system_prompt(context=None):
+    """Generate system prompt for travel assistant"""
+    loc_key = None
+    prefs_key = None
     if context:
-        if context.get("location"):
-            lat, lng = context["location"].get("lat"), context["location"].get("lng")
-            base_prompt += f"\n\nUser's current location: {lat}, {lng}"
-            
-        if context.get("preferences"):
-            prefs = context["preferences"]
-            base_prompt += f"\n\nUser preferences: {json.dumps(prefs, indent=2)}"
-    
-    return base_prompt
+        location = context.get("location")
+        if location:
+            # ~1km bucket keeps the cache key space small
+            loc_key = (round(location.get("lat"), 2), round(location.get("lng"), 2))
+        preferences = context.get("preferences")
+        if preferences:
+            prefs_key = json.dumps(preferences, sort_keys=True)
+    return _render_travel_prompt(loc_key, prefs_key)
+
+# Follow-up suggestions reused across requests as immutable tuples,
+# keyed by the keyword that triggers them
+SUGGESTION_MAP = {
+    "destination": (
+        "Tell me more about the local cuisine",
+        "What's the best time to visit?",
+        "Suggest a 3-day itinerary",
+        "What's the budget for this trip?"
+    ),
+    "itinerary": (
+        "Add restaurant recommendations",
+        "Include transportation details",
+        "Suggest alternative activities",
+        "What about shopping areas?"
+    ),
+}
 
 @app.get("/health")
 async def health_check():
@@ -212,76 +327,254 @@ async def health_check():
         "status": "healthy",
         "service": "AI Travel Companion",
         "version": "1.0.0",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": app.state.now_iso,
         "ai_configured": True,
         "ai_provider": "NVIDIA NIM",
         "ai_model": AI_MODEL
     }
 
+# Bump when the system prompt changes so stale answers don't survive it
+SYSTEM_PROMPT_VERSION = 1
+CHAT_CACHE_TTL = 3600
+SEMANTIC_THRESHOLD = 0.95
+SEMANTIC_CACHE_MAX = 10_000
+
+def chat_cache_key(request: ChatRequest) -> str:
+    """Exact-match cache key over everything that shapes the answer
+
+    Coordinates are rounded to a ~1km grid so nearby users share entries.
+    """
+    location_bucket = None
+    if request.location:
+        location_bucket = {k: round(v, 2) for k, v in request.location.items()}
+    canonical = json.dumps({
+        "prompt": SYSTEM_PROMPT_VERSION,
+        "model": AI_MODEL,
+        "message": request.message,
+        "history": [(m.role, m.content) for m in request.conversation_history[-10:]],
+        "location": location_bucket,
+        "preferences": request.preferences,
+    }, sort_keys=True)
+    return "chat:" + hashlib.blake2b(canonical.encode()).hexdigest()
+
+class SemanticCache:
+    """Embedding index over previously answered chat messages
+
+    Near-duplicate questions ("best time to visit Paris?" vs "when should
+    I visit Paris?") map to the Redis key of the original answer when the
+    cosine similarity clears the threshold. Model and index load lazily
+    so the service starts fast when the cache never gets used.
+    """
+
+    def __init__(self):
+        self._model = None
+        self._index = None
+        self._keys = []
+        # lookup/add run via asyncio.to_thread from concurrent requests
+        # and faiss indexes aren't safe for add() during search(); the
+        # lock also keeps _keys aligned with the index
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._index is None:
+                import faiss
+                from embedding_model import load_embedding_model
+                self._model = load_embedding_model()
+                self._index = faiss.IndexFlatIP(384)
+
+    def _embed(self, message: str):
+        import numpy as np
+        embedding = self._model.encode([message], normalize_embeddings=True)
+        return np.asarray(embedding, dtype="float32")
+
+    def lookup(self, message: str):
+        """Return (cache_key or None, query embedding) for a message"""
+        self._ensure_loaded()
+        embedding = self._embed(message)
+        with self._lock:
+            if self._index.ntotal == 0:
+                return None, embedding
+            scores, ids = self._index.search(embedding, 1)
+            if scores[0][0] >= SEMANTIC_THRESHOLD:
+                return self._keys[ids[0][0]], embedding
+        return None, embedding
+
+    def add(self, cache_key: str, embedding):
+        self._ensure_loaded()
+        import numpy as np
+        with self._lock:
+            if len(self._keys) >= SEMANTIC_CACHE_MAX:
+                # Redis entries expire but the index never did; evict the
+                # oldest vector so _keys and ntotal stay bounded together
+                self._index.remove_ids(np.array([0], dtype=np.int64))
+                self._keys.pop(0)
+            self._index.add(embedding)
+            self._keys.append(cache_key)
+
+semantic_cache = SemanticCache()
+
+# Rolling server-side history: clients with a user_id only send the new
+# message; the last turns live in a capped Redis list
+HISTORY_TTL = 86400
+
+async def load_history(user_id: str) -> list:
+    """Fetch the last 10 stored messages, oldest first"""
+    entries = await app.state.redis.lrange(f"hist:{user_id}", 0, 9)
+    # LPUSH keeps newest first; reverse back to chronological order
+    return [json.loads(entry) for entry in reversed(entries)]
+
+async def store_history_turn(user_id: str, message: str, ai_response: str):
+    """Append one user/assistant turn and cap the list at 20 messages"""
+    key = f"hist:{user_id}"
+    await app.state.redis.lpush(
+        key,
+        json.dumps({"role": "user", "content": message}),
+        json.dumps({"role": "assistant", "content": ai_response}),
+    )
+    await app.state.redis.ltrim(key, 0, 19)
+    await app.state.redis.expire(key, HISTORY_TTL)
+
+# Trim client-supplied history by tokens, not message count, so long
+# messages can't blow past the model context. cl100k_base approximates
+# the NIM tokenizer closely enough for budgeting.
+_HISTORY_ENCODING = tiktoken.get_encoding("cl100k_base")
+HISTORY_TOKEN_BUDGET = 3000
+
+@lru_cache(maxsize=4096)
+def _token_len(text: str) -> int:
+    """Token count per message, memoized since history repeats across turns"""
+    return len(_HISTORY_ENCODING.encode(text))
+
+def build_chat_messages(request: ChatRequest, server_history: list = None) -> list:
+    """Assemble system prompt, recent history, and the current message
+
+    Server-side history wins when available; the request field remains as
+    a fallback for anonymous clients.
+    """
+    messages = [
+        {"role": "system", "content": get_travel_system_prompt({
+            "location": request.location,
+            "preferences": request.preferences
+        })}
+    ]
+
+    if server_history is not None:
+        messages.extend(server_history)
+    else:
+        # Keep the newest client-supplied history that fits the token
+        # budget; a fixed message count let ten long messages blow past
+        # the model context
+        budget = HISTORY_TOKEN_BUDGET
+        kept = []
+        for msg in reversed(request.conversation_history):
+            budget -= _token_len(msg.content)
+            if budget < 0:
+                break
+            kept.append({"role": msg.role, "content": msg.content})
+        kept.reverse()
+        messages.extend(kept)
+
+    messages.append({
+        "role": "user",
+        "content": request.message
+    })
+    return messages
+
+async def load_history_safe(request: ChatRequest) -> Optional[list]:
+    """History lookup that degrades to client-supplied history"""
+    if not request.user_id:
+        return None
+    try:
+        return await load_history(request.user_id)
+    except Exception as e:
+        logger.warning(f"History lookup failed: {e}")
+        return None
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_ai(request: ChatRequest):
     """Real-time chat with AI travel assistant"""
     try:
-        # NVIDIA NIM API is always available now
-        
+        # Server-side history makes answers per-user and per-turn, so only
+        # anonymous requests go through the shared response caches; a
+        # history-shaped answer must never be served to another user or
+        # replayed after the conversation has moved on
+        cacheable = not request.user_id
+        cache_key = chat_cache_key(request) if cacheable else None
+        query_embedding = None
+        if cacheable:
+            try:
+                # Exact cache hit: identical canonical request within the TTL
+                cached = await app.state.redis.get(cache_key)
+                if cached is not None:
+                    CACHE_HITS.labels("exact").inc()
+                    return ChatResponse(**json.loads(cached))
+
+                # Near-duplicate hit: embedding similarity above the threshold
+                near_key, query_embedding = await asyncio.to_thread(
+                    semantic_cache.lookup, request.message
+                )
+                if near_key is not None:
+                    cached = await app.state.redis.get(near_key)
+                    if cached is not None:
+                        CACHE_HITS.labels("semantic").inc()
+                        return ChatResponse(**json.loads(cached))
+            except Exception as e:
+                logger.warning(f"Chat cache lookup failed: {e}")
+        CACHE_HITS.labels("miss").inc()
+
         # Build conversation context
-        messages = [
-            {"role": "system", "content": get_travel_system_prompt({
-                "location": request.location,
-                "preferences": request.preferences
-            })}
-        ]
-        
-        # Add conversation history
-        for msg in request.conversation_history[-10:]:  # Keep last 10 messages
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        # Add current user message
-        messages.append({
-            "role": "user", 
-            "content": request.message
-        })
-        
+        messages = build_chat_messages(request, await load_history_safe(request))
+
         # Call NVIDIA NIM API
         logger.info(f"Making NVIDIA NIM API call for user: {request.user_id}")
         
-        response = openai_client.chat.completions.create(
-            model=AI_MODEL,
-            messages=messages,
-            max_tokens=1000,
-            temperature=1,
-            top_p=1
-        )
-        
+        with LLM_SECONDS.labels("chat").time():
+            response = await app.state.ai.chat.completions.create(
+                model=AI_MODEL,
+                messages=messages,
+                max_tokens=1000,
+                temperature=1,
+                top_p=1
+            )
+
         ai_response = response.choices[0].message.content
         
-        # Generate follow-up suggestions
-        suggestions = []
-        if "destination" in request.message.lower():
-            suggestions = [
-                "Tell me more about the local cuisine",
-                "What's the best time to visit?",
-                "Suggest a 3-day itinerary",
-                "What's the budget for this trip?"
-            ]
-        elif "itinerary" in request.message.lower():
-            suggestions = [
-                "Add restaurant recommendations",
-                "Include transportation details", 
-                "Suggest alternative activities",
-                "What about shopping areas?"
-            ]
-        
-        return ChatResponse(
+        # Generate follow-up suggestions; the shared tuples avoid building
+        # a new list per request
+        message_lower = request.message.lower()
+        suggestions = ()
+        for keyword, candidates in SUGGESTION_MAP.items():
+            if keyword in message_lower:
+                suggestions = candidates
+                break
+
+
+        chat_response = ChatResponse(
             response=ai_response,
             conversation_id=request.user_id,
             suggestions=suggestions,
             places=[]  # TODO: Extract places from AI response
         )
-        
+
+        try:
+            if cacheable:
+                await app.state.redis.set(
+                    cache_key, chat_response.model_dump_json(), ex=CHAT_CACHE_TTL
+                )
+                if query_embedding is not None:
+                    await asyncio.to_thread(
+                        semantic_cache.add, cache_key, query_embedding
+                    )
+            if request.user_id:
+                await store_history_turn(
+                    request.user_id, request.message, ai_response
+                )
+        except Exception as e:
+            logger.warning(f"Chat cache store failed: {e}")
+
+        return chat_response
+
     except openai.RateLimitError:
         logger.error("OpenAI rate limit exceeded")
         raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
@@ -292,30 +585,93 @@ async def chat_with_ai(request: ChatRequest):
     
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
-        # Return fallback response instead of error
+        # Return fallback response instead of error; classify once and share
+        # the category between the response and suggestion lookups
+        category = classify(request.message)
         return ChatResponse(
-            response=generate_fallback_response(request.message),
-            session_id=f"fallback_{datetime.now().timestamp()}",
-            suggestions=generate_suggestions(request.message)
+            response=generate_fallback_response(request.message, category),
+            session_id=f"fallback_{time.time_ns() // 1_000_000_000}",
+            suggestions=generate_suggestions(request.message, category)
         )
 
-@app.post("/travel-dna/analyze", response_model=TravelDNAResponse)
-async def analyze_user_travel_dna(request: TravelDNARequest):
-    """Analyze user's travel DNA based on quiz responses"""
+@app.post("/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """Chat with tokens streamed over SSE as they are generated
+
+    Time-to-first-byte drops to roughly the first token instead of the
+    full completion; the generator must stay async so FastAPI doesn't
+    push it onto the threadpool.
+    """
+    messages = build_chat_messages(request, await load_history_safe(request))
+
+    async def token_gen():
+        # Deltas are re-assembled so the finished turn lands in the same
+        # server-side history the non-streaming path writes; otherwise a
+        # client following the send-only-the-new-message contract loses
+        # every streamed exchange
+        parts = []
+        try:
+            stream = await app.state.ai.chat.completions.create(
+                model=AI_MODEL,
+                messages=messages,
+                max_tokens=1000,
+                temperature=1,
+                top_p=1,
+                stream=True
+            )
+            last_beat = time.monotonic()
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content or ""
+                parts.append(delta)
+                yield f"data: {json.dumps({'t': delta})}\n\n"
+                # Comment frames keep proxies from timing out long gaps
+                now = time.monotonic()
+                if now - last_beat >= 15:
+                    yield ": keepalive\n\n"
+                    last_beat = now
+            yield "data: [DONE]\n\n"
+            if request.user_id and parts:
+                try:
+                    await store_history_turn(
+                        request.user_id, request.message, "".join(parts)
+                    )
+                except Exception as e:
+                    logger.warning(f"Stream history store failed: {e}")
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}")
+            yield f"data: {json.dumps({'error': 'stream failed'})}\n\n"
+
+    return StreamingResponse(token_gen(), media_type="text/event-stream")
+
+# In-flight recommendation calls keyed by DNA type. With only five types,
+# quiz-completion bursts collapse to at most five concurrent upstream calls;
+# everyone else awaits the future of the request already in flight.
+_dna_inflight: Dict[str, asyncio.Future] = {}
+DNA_REC_TTL = 86400
+
+async def _dna_recommendations(dna_type: str, dna_info: Dict[str, Any]) -> List[str]:
+    """Fetch AI recommendations for a DNA type, deduplicating concurrent calls."""
+    cache_key = f"dna:rec:{dna_type}:v{SYSTEM_PROMPT_VERSION}"
     try:
-        # Analyze travel DNA
-        analysis = analyze_travel_dna(request.answers)
-        dna_type = analysis["dna_type"]
-        dna_info = TRAVEL_DNA_TYPES[dna_type]
-        
-        # Generate personalized recommendations using AI
-        prompt = f"""Based on the travel DNA type '{dna_info['name']}' with traits {dna_info['traits']}, 
-        generate 5 specific, actionable travel recommendations. Include destinations, activities, and tips 
+        cached = await app.state.redis.get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+    except Exception:
+        pass
+
+    fut = _dna_inflight.get(dna_type)
+    if fut is not None:
+        return await fut
+
+    fut = asyncio.get_running_loop().create_future()
+    _dna_inflight[dna_type] = fut
+    try:
+        prompt = f"""Based on the travel DNA type '{dna_info['name']}' with traits {dna_info['traits']},
+        generate 5 specific, actionable travel recommendations. Include destinations, activities, and tips
         that match this personality type. Be specific and practical."""
-        
-        # NVIDIA NIM API is always available
-        try:
-            response = openai_client.chat.completions.create(
+
+        with LLM_SECONDS.labels("travel_dna").time():
+            response = await app.state.ai.chat.completions.create(
                 model=AI_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a travel expert providing personalized recommendations."},
@@ -324,10 +680,52 @@ async def analyze_user_travel_dna(request: TravelDNARequest):
                 max_tokens=500,
                 temperature=0.8
             )
-            
-            ai_recommendations = response.choices[0].message.content.split('\n')
-            recommendations = [rec.strip() for rec in ai_recommendations if rec.strip()]
-            
+
+        ai_recommendations = response.choices[0].message.content.split('\n')
+        recommendations = [rec.strip() for rec in ai_recommendations if rec.strip()]
+        try:
+            await app.state.redis.set(
+                cache_key, json.dumps(recommendations), ex=DNA_REC_TTL
+            )
+        except Exception:
+            pass
+        fut.set_result(recommendations)
+        return recommendations
+    except BaseException as e:
+        fut.set_exception(e)
+        # The awaiters consume the exception; don't let it also warn as
+        # "never retrieved" if nobody else was waiting
+        fut.exception()
+        raise
+    finally:
+        _dna_inflight.pop(dna_type, None)
+
+async def _warm_dna_recommendations():
+    """Prefill the per-type recommendation cache at startup
+
+    Five DNA types mean five LLM calls per TTL window globally; warming
+    them in the background keeps even the first quiz completion on the
+    Redis fast path. Failures just leave lazy caching to do the work.
+    """
+    for dna_type, dna_info in TRAVEL_DNA_TYPES.items():
+        try:
+            await _dna_recommendations(dna_type, dna_info)
+        except Exception as e:
+            logger.warning(f"DNA recommendation warm-up failed for {dna_type}: {e}")
+
+@app.post("/travel-dna/analyze", response_model=TravelDNAResponse)
+async def analyze_user_travel_dna(request: TravelDNARequest):
+    """Analyze user's travel DNA based on quiz responses"""
+    try:
+        # Analyze travel DNA
+        analysis = analyze_travel_dna(request.answers)
+        dna_type = analysis["dna_type"]
+        dna_info = TRAVEL_DNA_TYPES[dna_type]
+
+        # Generate personalized recommendations using AI; concurrent
+        # identical requests coalesce onto one upstream call
+        try:
+            recommendations = await _dna_recommendations(dna_type, dna_info)
         except Exception as e:
             logger.warning(f"AI recommendation generation failed: {e}")
             recommendations = [
@@ -337,7 +735,7 @@ async def analyze_user_travel_dna(request: TravelDNARequest):
                 "Plan trips that align with your natural preferences",
                 "Document your travels to track personal growth"
             ]
-        
+
         return TravelDNAResponse(
             dna_type=dna_info["name"],
             description=dna_info["description"],
@@ -359,8 +757,17 @@ async def get_destination_recommendations(
 ):
     """Get AI-powered destination recommendations"""
     try:
-        # NVIDIA NIM API is always configured
-        
+        # Identical criteria within the TTL come straight from Redis
+        cache_key = "dest:" + hashlib.blake2b(json.dumps(
+            [AI_MODEL, lat, lng, budget, interests, duration]
+        ).encode()).hexdigest()
+        try:
+            cached = await app.state.redis.get(cache_key)
+            if cached is not None:
+                return json.loads(cached)
+        except Exception as e:
+            logger.warning(f"Destination cache lookup failed: {e}")
+
         # Build recommendation prompt
         prompt = "Recommend 5 travel destinations based on the following criteria:\n"
         
@@ -375,17 +782,18 @@ async def get_destination_recommendations(
             
         prompt += "\nFor each destination, provide: name, country, brief description, estimated budget, and top 3 activities."
         
-        response = openai_client.chat.completions.create(
-            model=AI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a travel expert providing destination recommendations."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=800,
-            temperature=0.7
-        )
+        with LLM_SECONDS.labels("destinations").time():
+            response = await app.state.ai.chat.completions.create(
+                model=AI_MODEL,
+                messages=[
+                    {"role": "system", "content": "You are a travel expert providing destination recommendations."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=800,
+                temperature=0.7
+            )
         
-        return {
+        result = {
             "recommendations": response.choices[0].message.content,
             "criteria": {
                 "location": f"{lat}, {lng}" if lat and lng else None,
@@ -394,16 +802,63 @@ async def get_destination_recommendations(
                 "duration": duration
             }
         }
-        
+
+        try:
+            await app.state.redis.set(cache_key, json.dumps(result), ex=CHAT_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Destination cache store failed: {e}")
+
+        return result
+
     except Exception as e:
         logger.error(f"Destination recommendation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Recommendation service error: {str(e)}")
 
+class BatchJob(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
+    kind: str = Field(..., description="Job kind: chat, dna, or recommendations")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Job parameters")
+
+class BatchRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
+    jobs: List[BatchJob] = Field(..., description="Jobs to run concurrently")
+
+@app.post("/batch")
+async def run_batch(request: BatchRequest):
+    """Run several independent jobs in one HTTP round-trip
+
+    Clients validating multiple endpoints (or prefetching several views)
+    pay one connection and one serialization pass instead of one per
+    job; the jobs themselves run concurrently server-side.
+    """
+    async def run_job(job: BatchJob):
+        if job.kind == "chat":
+            return await chat_with_ai(ChatRequest(**job.payload))
+        if job.kind == "dna":
+            return await analyze_user_travel_dna(TravelDNARequest(**job.payload))
+        if job.kind == "recommendations":
+            return await get_destination_recommendations(**job.payload)
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {job.kind}")
+
+    results = await asyncio.gather(
+        *(run_job(job) for job in request.jobs), return_exceptions=True
+    )
+    return {
+        "results": [
+            {"error": str(r)} if isinstance(r, BaseException) else r
+            for r in results
+        ]
+    }
+
 if __name__ == "__main__":
-    # Production server configuration
+    # Production server configuration; Redis carries the cache and history
+    # so workers stay stateless
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
-    
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count()))
+
     logger.info(f"Starting AI Travel Companion Service on {host}:{port}")
     logger.info(f"AI API configured: True - Provider: NVIDIA NIM - Model: {AI_MODEL}")
     
@@ -411,6 +866,9 @@ if __name__ == "__main__":
         "production_main:app",
         host=host,
         port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
         reload=False,  # Disable reload in production
         log_level="info",
         access_log=True
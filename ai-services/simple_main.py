@@ -6,6 +6,8 @@ Provides basic chat functionality without heavy ML dependencies
 
 import os
 import logging
+import re
+import time
 from datetime import datetime
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -36,13 +38,16 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Add CORS middleware
+# Add CORS middleware. Enumerated methods/headers keep preflight
+# responses static instead of echoing whatever the request sent, and
+# max_age lets browsers cache the preflight for a day.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,
 )
 
 # Request/Response models
@@ -73,6 +78,17 @@ TRAVEL_RESPONSES = {
     "weather": "Weather can make or break a trip! ☀️ I recommend checking seasonal patterns and packing layers for comfort in any conditions."
 }
 
+# One compiled alternation scans for every keyword in a single pass; the
+# matched group name indexes straight into TRAVEL_RESPONSES. IGNORECASE
+# folds case in C, so no lower() copy of the message is needed.
+TRAVEL_RESPONSE_RE = re.compile(
+    "|".join(
+        "(?P<%s>%s)" % (keyword, re.escape(keyword))
+        for keyword in TRAVEL_RESPONSES
+    ),
+    re.IGNORECASE,
+)
+
 def generate_travel_response(message: str) -> str:
     """Generate a travel-related response using OpenAI or fallback to keywords"""
     
@@ -96,14 +112,11 @@ def generate_travel_response(message: str) -> str:
         except Exception as e:
             logger.warning(f"OpenAI API error: {e}, falling back to keyword responses")
     
-    # Fallback to keyword-based responses
-    message_lower = message.lower()
-    
-    # Check for specific keywords and return relevant responses
-    for keyword, response in TRAVEL_RESPONSES.items():
-        if keyword in message_lower:
-            return response
-    
+    # Fallback to keyword-based responses, one linear scan
+    match = TRAVEL_RESPONSE_RE.search(message)
+    if match:
+        return TRAVEL_RESPONSES[match.lastgroup]
+
     # Default response for general travel queries
     return "I'd be happy to help you plan your travel! 🌍 Could you tell me more about what you're looking for? I can help with destinations, accommodations, activities, budgeting, and more!"
 
@@ -129,8 +142,9 @@ async def chat_endpoint(request: ChatRequest):
         # Generate response based on message content
         response_text = generate_travel_response(request.message)
         
-        # Create session ID (simple timestamp-based)
-        session_id = f"session_{request.user_id}_{int(datetime.now().timestamp())}"
+        # Create session ID (simple timestamp-based); time.time_ns skips
+        # the datetime allocation
+        session_id = f"session_{request.user_id}_{time.time_ns() // 1_000_000_000}"
         
         response = ChatResponse(
             response=response_text,
@@ -158,6 +172,16 @@ async def root():
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
-    
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count()))
+
     logger.info(f"Starting AI Travel Services on {host}:{port}")
-    uvicorn.run(app, host=host, port=port, log_level="info")
+    # uvloop/httptools replace the stdlib selector loop and http parser
+    uvicorn.run(
+        "simple_main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="info"
+    )
